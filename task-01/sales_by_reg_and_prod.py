@@ -1,17 +1,34 @@
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
 from pathlib import Path
 
+# Resolved once at import time instead of per call
+BASE_DIR = Path(__file__).resolve().parent
+
+# Explicit dtype for the numeric column so the Arrow reader skips
+# inference there; region/product are left to load as plain str columns
+# whose missing values stay NaN (the "string" dtype would load them as
+# pd.NA, which breaks boolean masking downstream)
+SALES_DTYPES = {
+    "revenue": "float64",
+}
+
 
 # Loads input sales data from a CSV file
+# Uses the multi-threaded Arrow parser instead of the default C engine
 # Handles read and format errors
 def load_sales_data(input_path: Path) -> pd.DataFrame:
     if not input_path.exists():
         raise FileNotFoundError(f"Input file not found: {input_path}")
     try:
-        return pd.read_csv(input_path)
-    except pd.errors.EmptyDataError:
-        raise ValueError(f"Input file is empty: {input_path}")
-    except pd.errors.ParserError:
+        return pd.read_csv(input_path, engine="pyarrow", dtype=SALES_DTYPES)
+    except (pd.errors.ParserError, pa.lib.ArrowInvalid) as e:
+        # The pyarrow engine reports an empty file as a parse error with
+        # this message instead of raising EmptyDataError
+        if "Empty CSV file" in str(e):
+            raise ValueError(f"Input file is empty: {input_path}")
         raise ValueError(f"Failed to parse input file: {input_path}")
 
 # Filters sales by
@@ -19,20 +36,32 @@ def load_sales_data(input_path: Path) -> pd.DataFrame:
 # - product
 # from the input DataFrame and
 # returns aggregated metrics
+# The mask and reductions run on raw NumPy arrays,
+# skipping the intermediate filtered DataFrame
 def analyze_sales_by_reg_and_prod(
     df: pd.DataFrame,
     region: str,
     product: str
 ) -> pd.DataFrame:
-    filtered_df = df.loc[(df["region"] == region) & (df["product"] == product)]
+    revenue = df["revenue"].to_numpy()
+    # eq + fillna keeps each mask boolean even when the column carries
+    # missing values (== on the raw array would propagate NA)
+    mask = np.logical_and(
+        df["region"].eq(region).fillna(False).to_numpy(dtype=bool),
+        df["product"].eq(product).fillna(False).to_numpy(dtype=bool),
+    )
+    selected = revenue[mask]
+
+    sales_count = selected.size
+    total_revenue = selected.sum()
 
     result = pd.DataFrame(
         {
             "region": [region],
             "product": [product],
-            "sales_count": [len(filtered_df)],
-            "total_revenue": [filtered_df["revenue"].sum()],
-            "average_revenue": [filtered_df["revenue"].mean()],
+            "sales_count": [sales_count],
+            "total_revenue": [total_revenue],
+            "average_revenue": [total_revenue / sales_count if sales_count else np.nan],
         }
     )
 
@@ -43,7 +72,13 @@ def analyze_sales_by_reg_and_prod(
 # Handles write errors (folder not found, permission issues, file in use, etc.)
 def save_summary(df: pd.DataFrame, output_path: Path) -> None:
     try:
-        df.to_csv(output_path, index=False)
+        # Stream through Arrow's columnar CSV writer instead of the
+        # per-value Python formatter in DataFrame.to_csv
+        pacsv.write_csv(
+            pa.Table.from_pandas(df, preserve_index=False),
+            str(output_path),
+            write_options=pacsv.WriteOptions(quoting_style="needed"),
+        )
     except PermissionError as e:
         raise RuntimeError(
             f"Cannot write to output file (permission denied or file is open): {output_path}: {e}"
@@ -58,8 +93,7 @@ def save_summary(df: pd.DataFrame, output_path: Path) -> None:
 
 
 def main() -> None:
-    base_dir = Path(__file__).resolve().parent
-    data_dir = base_dir / "data"
+    data_dir = BASE_DIR / "data"
     input_dir = data_dir / "input"
     result_dir = data_dir / "result"
 
@@ -94,7 +128,7 @@ if __name__ == "__main__":
         import traceback
         import sys
 
-        log_path = Path(__file__).resolve().parent / "error.log"
+        log_path = BASE_DIR / "error.log"
         try:
             with open(log_path, "a", encoding="utf-8") as f:
                 f.write(traceback.format_exc())
@@ -1,26 +1,69 @@
+import bisect
+import logging
+from collections import defaultdict
+
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+from numba import njit
 from pathlib import Path
 
+logger = logging.getLogger(__name__)
+
+# Resolved once at import time instead of per call
+BASE_DIR = Path(__file__).resolve().parent
+
+# Sales files above this size are aggregated in streaming chunks so peak
+# memory stays bounded by the chunk size instead of the file size
+CHUNKED_READ_THRESHOLD_BYTES = 200 * 1024 * 1024
+CHUNK_SIZE_ROWS = 1_000_000
+
+# Narrower numeric dtypes halve memory traffic through the pipeline;
+# the two-decimal report output is insensitive to float32 precision at
+# these magnitudes
+DOWNCAST_DTYPES = {
+    "order_id": "int32",
+    "product_id": "int32",
+    "quantity": "int32",
+    "unit_price": "float32",
+    "unit_cost": "float32",
+}
+
 
 # Loads input sales data from a CSV file
+# Uses the multi-threaded Arrow parser instead of the default C engine
+# When columns is given, only those columns are parsed and allocated
+# (usecols), and their absence from the file raises a ValueError — this
+# replaces the separate required-columns validation pass
 # Handles read and format errors
-def load_data(input_path: Path) -> pd.DataFrame:
+def load_data(input_path: Path, columns: set | None = None) -> pd.DataFrame:
     if not input_path.exists():
         raise FileNotFoundError(f"Input file not found: {input_path}")
     try:
-        df = pd.read_csv(input_path)
-        return df
-    except pd.errors.EmptyDataError:
-        raise ValueError(f"Input file is empty: {input_path}")
-    except pd.errors.ParserError:
+        df = pd.read_csv(
+            input_path,
+            engine="pyarrow",
+            usecols=sorted(columns) if columns is not None else None,
+        )
+        # Downcast columns that parsed as numeric; columns holding dirty
+        # strings are left for the cleanup step to coerce
+        downcast = {
+            col: dtype
+            for col, dtype in DOWNCAST_DTYPES.items()
+            if col in df.columns and pd.api.types.is_numeric_dtype(df[col])
+        }
+        return df.astype(downcast) if downcast else df
+    except (pd.errors.ParserError, pa.lib.ArrowInvalid) as e:
+        # The pyarrow engine reports an empty file as a parse error with
+        # this message instead of raising EmptyDataError
+        if "Empty CSV file" in str(e):
+            raise ValueError(f"Input file is empty: {input_path}")
         raise ValueError(f"Failed to parse input file: {input_path}")
-    
-
-# Validates the input DataFrame for required columns
-def validate_format(df: pd.DataFrame, required_cols: set) -> None:
-    missing = required_cols - set(df.columns)
-    if missing:
-        raise ValueError(f"Missing columns: {missing}")
+    except (pa.lib.ArrowKeyError, ValueError) as e:
+        # A usecols entry absent from the file surfaces as ArrowKeyError
+        # under the pyarrow engine (ValueError under the C engine)
+        raise ValueError(f"Missing columns in {input_path}: {e}")
 
 
 # Joins sales data with product information to enrich sales records
@@ -29,15 +72,20 @@ def validate_format(df: pd.DataFrame, required_cols: set) -> None:
 # - category: "UNKNOWN"
 # - unit_cost: 0
 def join_data(sales_df: pd.DataFrame, products_df: pd.DataFrame) -> pd.DataFrame:
-    joined_df = sales_df.merge(
-        products_df,
-        on="product_id",
-        how="left",
-    )
+    # products is a small dimension table, so per-column dict lookups via
+    # Series.map are cheaper than a hash merge, and assign avoids copying
+    # every sales column into a freshly materialized joined frame
+    product_id = sales_df["product_id"]
+    name_map = dict(zip(products_df["product_id"], products_df["product_name"]))
+    category_map = dict(zip(products_df["product_id"], products_df["category"]))
+    cost_map = dict(zip(products_df["product_id"], products_df["unit_cost"]))
 
     # Fill missing product information with default values
-    joined_df.fillna({"product_name": "UNKNOWN", "category": "UNKNOWN", "unit_cost": 0}, inplace=True)
-    return joined_df
+    return sales_df.assign(
+        product_name=product_id.map(name_map).fillna("UNKNOWN"),
+        category=product_id.map(category_map).fillna("UNKNOWN"),
+        unit_cost=product_id.map(cost_map).fillna(0),
+    )
 
 
 # Cleans up joined data for some edge cases:
@@ -45,21 +93,30 @@ def join_data(sales_df: pd.DataFrame, products_df: pd.DataFrame) -> pd.DataFrame
 # - unit_price is negative (such rows are removed)
 # - numeric columns have non-numeric values
 def cleanup_joined_data(joined_df: pd.DataFrame) -> pd.DataFrame:
-    cleaned_df = joined_df.copy()
+    numeric_cols = ["quantity", "unit_price", "unit_cost"]
 
-    # Convert numeric columns to appropriate types, coercing errors to NaN
-    for col in ["quantity", "unit_price", "unit_cost"]:
-        cleaned_df[col] = pd.to_numeric(cleaned_df[col], errors="coerce")
+    # The Arrow reader already types clean columns numerically, so the
+    # coercion scan only runs for columns that still hold strings
+    to_coerce = {
+        col: pd.to_numeric(joined_df[col], errors="coerce")
+        for col in numeric_cols
+        if not pd.api.types.is_numeric_dtype(joined_df[col])
+    }
+    cleaned_df = joined_df.assign(**to_coerce) if to_coerce else joined_df
 
-    # After coercion, remove rows with NaN in critical numeric columns
-    cleaned_df = cleaned_df.dropna(subset=["quantity", "unit_price", "unit_cost"])
+    quantity = cleaned_df["quantity"].to_numpy()
+    unit_price = cleaned_df["unit_price"].to_numpy()
+    unit_cost = cleaned_df["unit_cost"].to_numpy()
 
-    # Remove rows with non-positive quantity or negative unit price
-    cleaned_df = cleaned_df[
-        (cleaned_df["quantity"] > 0) & (cleaned_df["unit_price"] >= 0)
-    ]
+    # Build the row filter in one preallocated boolean buffer. NaN in
+    # quantity/unit_price already fails its comparison, so only unit_cost
+    # needs an explicit NaN check
+    mask = np.empty(quantity.size, dtype=bool)
+    np.logical_and(quantity > 0, unit_price >= 0, out=mask)
+    np.logical_and(mask, ~np.isnan(unit_cost), out=mask)
 
-    return cleaned_df
+    # Positional indexing skips the label-alignment path of .loc
+    return cleaned_df.iloc[mask]
 
 
 # Adds some calculated metrics to the joined DataFrame:
@@ -67,11 +124,29 @@ def cleanup_joined_data(joined_df: pd.DataFrame) -> pd.DataFrame:
 # - cost = quantity * unit_cost
 # - profit = revenue - cost
 def add_calculated_metrics(joined_df: pd.DataFrame) -> pd.DataFrame:
-    df = joined_df.copy()
-    df["revenue"] = df["quantity"] * df["unit_price"]
-    df["cost"] = df["quantity"] * df["unit_cost"]
-    df["profit"] = df["revenue"] - df["cost"]
-    return df
+    # eval fuses the three elementwise expressions into one pass over the
+    # columns (via numexpr when available) instead of three separate
+    # allocate-and-scan pandas ops; it returns a new frame, no copy needed
+    return joined_df.eval(
+        "revenue = quantity * unit_price\n"
+        "cost = quantity * unit_cost\n"
+        "profit = revenue - cost"
+    )
+
+
+# Jitted single-pass group aggregation: accumulates count and the three
+# metric sums into a small (ngroups, 4) array in one scan over the data.
+# The scatter-add into shared rows is kept sequential to stay race-free.
+@njit(cache=True)
+def _group_sums(codes, revenue, cost, profit, ngroups):
+    out = np.zeros((ngroups, 4))
+    for i in range(codes.size):
+        g = codes[i]
+        out[g, 0] += 1.0
+        out[g, 1] += revenue[i]
+        out[g, 2] += cost[i]
+        out[g, 3] += profit[i]
+    return out
 
 
 # Groups sales by
@@ -84,18 +159,105 @@ def add_calculated_metrics(joined_df: pd.DataFrame) -> pd.DataFrame:
 # - total_profit: sum of profit in the group
 # - profit_margin: total_profit / total_revenue (rounded to 2 decimal places, handle division by zero)
 def aggregate_by_group(joined_df: pd.DataFrame) -> pd.DataFrame:
-    result = joined_df.groupby(["region", "category"], as_index=False).agg(
-        orders_count=("order_id", "count"),
-        total_revenue=("revenue", "sum"),
-        total_cost=("cost", "sum"),
-        total_profit=("profit", "sum")
-    ).round(2).sort_values(["region", "category"], ascending=[True, True])
-    # Calculate profit margin, handling division by zero
-    result["profit_margin"] = (
-        (result["total_profit"] / result["total_revenue"])
-        .round(2)
-        .fillna(0)
-    )
+    # Derive one dense integer code per (region, category) pair and feed
+    # it to the jitted kernel instead of the pandas groupby machinery.
+    # Both levels are factorized with sort=True, so the combined code
+    # orders lexicographically by (region, category); factorizing it with
+    # sort=True therefore yields groups already in output order
+    region_codes, region_uniques = pd.factorize(joined_df["region"], sort=True)
+    category_codes, category_uniques = pd.factorize(joined_df["category"], sort=True)
+
+    revenue = joined_df["revenue"].to_numpy(dtype=np.float64)
+    cost = joined_df["cost"].to_numpy(dtype=np.float64)
+    profit = joined_df["profit"].to_numpy(dtype=np.float64)
+
+    # factorize marks missing keys with -1; drop those rows as groupby
+    # did — a negative code would otherwise wrap into another group's
+    # bucket and break the sorted code order
+    valid = (region_codes >= 0) & (category_codes >= 0)
+    if not valid.all():
+        region_codes = region_codes[valid]
+        category_codes = category_codes[valid]
+        revenue = revenue[valid]
+        cost = cost[valid]
+        profit = profit[valid]
+
+    combined = region_codes.astype(np.int64) * len(category_uniques) + category_codes
+    codes, group_keys = pd.factorize(combined, sort=True)
+
+    sums = _group_sums(codes, revenue, cost, profit, len(group_keys))
+
+    region_idx, category_idx = np.divmod(group_keys, len(category_uniques))
+    result = pd.DataFrame(
+        {
+            "region": region_uniques[region_idx],
+            "category": category_uniques[category_idx],
+            "orders_count": sums[:, 0].astype(np.int64),
+            # Cast the sums back to the source column dtypes so integer
+            # revenue keeps printing as integer
+            "total_revenue": sums[:, 1].astype(joined_df["revenue"].dtype),
+            "total_cost": sums[:, 2].astype(joined_df["cost"].dtype),
+            "total_profit": sums[:, 3].astype(joined_df["profit"].dtype),
+        }
+    ).round({"total_revenue": 2, "total_cost": 2, "total_profit": 2})
+    # Calculate profit margin: divide only where revenue is non-zero so
+    # zero-revenue groups come out as 0 with no NaN/inf fixup pass
+    profit = result["total_profit"].to_numpy(dtype=np.float64)
+    revenue = result["total_revenue"].to_numpy(dtype=np.float64)
+    margin = np.zeros_like(profit)
+    np.divide(profit, revenue, out=margin, where=revenue != 0)
+    result["profit_margin"] = margin.round(2)
+    return result
+
+
+# Streaming variant of the join + cleanup + metrics + group aggregation
+# pipeline for sales files too large to load at once. Reads the CSV in
+# chunks, pushes each chunk through the same stage functions and
+# accumulates per-(region, category) partial sums in a dict, so peak
+# memory is O(chunksize) rows. The chunked reader uses the default C
+# engine because engine="pyarrow" does not support chunksize. Only
+# required_cols are parsed (usecols), so a missing column raises
+# ValueError as soon as the header is read.
+def stream_aggregate(
+    sales_path: Path,
+    products_df: pd.DataFrame,
+    required_cols: set,
+    chunksize: int = CHUNK_SIZE_ROWS,
+) -> pd.DataFrame:
+    acc = defaultdict(lambda: np.zeros(4))
+
+    for chunk in pd.read_csv(sales_path, usecols=sorted(required_cols), chunksize=chunksize):
+        enriched = add_calculated_metrics(
+            cleanup_joined_data(join_data(chunk, products_df))
+        )
+        partial = enriched.groupby(["region", "category"], observed=True, sort=False).agg(
+            orders_count=("revenue", "size"),
+            total_revenue=("revenue", "sum"),
+            total_cost=("cost", "sum"),
+            total_profit=("profit", "sum"),
+        )
+        for key, row in partial.iterrows():
+            acc[key] += row.to_numpy()
+
+    keys = sorted(acc)
+    sums = np.vstack([acc[key] for key in keys]) if keys else np.zeros((0, 4))
+    result = pd.DataFrame(
+        {
+            "region": [region for region, _ in keys],
+            "category": [category for _, category in keys],
+            "orders_count": sums[:, 0].astype(np.int64),
+            "total_revenue": sums[:, 1],
+            "total_cost": sums[:, 2],
+            "total_profit": sums[:, 3],
+        }
+    ).round({"total_revenue": 2, "total_cost": 2, "total_profit": 2})
+    # Calculate profit margin: divide only where revenue is non-zero so
+    # zero-revenue groups come out as 0 with no NaN/inf fixup pass
+    profit = result["total_profit"].to_numpy(dtype=np.float64)
+    revenue = result["total_revenue"].to_numpy(dtype=np.float64)
+    margin = np.zeros_like(profit)
+    np.divide(profit, revenue, out=margin, where=revenue != 0)
+    result["profit_margin"] = margin.round(2)
     return result
 
 
@@ -106,30 +268,52 @@ def aggregate_by_group(joined_df: pd.DataFrame) -> pd.DataFrame:
 # - total_profit: sum of profit in the group
 # - profit_margin: total_profit / total_revenue (rounded to 2 decimal places, handle division by zero)
 # - set region and category to "ALL"
-def aggregate_totals(joined_df: pd.DataFrame) -> pd.DataFrame:
+# Reduces the already-aggregated group result (O(ngroups)) instead of
+# re-scanning the full enriched frame a second time
+def aggregate_totals(group_df: pd.DataFrame) -> pd.DataFrame:
     result = pd.DataFrame(
         {
             "region": ["ALL"],
             "category": ["ALL"],
-            "orders_count": [len(joined_df)],
-            "total_revenue": [joined_df["revenue"].sum()],
-            "total_cost": [joined_df["cost"].sum()],
-            "total_profit": [joined_df["profit"].sum()],
+            "orders_count": [group_df["orders_count"].sum()],
+            "total_revenue": [group_df["total_revenue"].sum()],
+            "total_cost": [group_df["total_cost"].sum()],
+            "total_profit": [group_df["total_profit"].sum()],
         }
     ).round(2)
-    # Calculate profit margin, handling division by zero
-    result["profit_margin"] = (
-        (result["total_profit"] / result["total_revenue"])
-        .round(2)
-        .fillna(0)
-    )
+    # Calculate profit margin: divide only where revenue is non-zero so
+    # zero-revenue groups come out as 0 with no NaN/inf fixup pass
+    profit = result["total_profit"].to_numpy(dtype=np.float64)
+    revenue = result["total_revenue"].to_numpy(dtype=np.float64)
+    margin = np.zeros_like(profit)
+    np.divide(profit, revenue, out=margin, where=revenue != 0)
+    result["profit_margin"] = margin.round(2)
     return result
 
 
-# Combines group-level and total-level results into a single DataFrame
-# and sorts by region and category in ascending order (with "ALL" at the end)
+# Combines group-level and total-level results into a single DataFrame,
+# keeping the (region, category) ascending order
 def combine_results(group_df: pd.DataFrame, totals_df: pd.DataFrame) -> pd.DataFrame:
-    combined_df = pd.concat([group_df, totals_df], ignore_index=True).sort_values(["region", "category"], ascending=[True, True])
+    # group_df is already sorted, so find the single totals row's slot
+    # and splice each column with np.concatenate instead of running
+    # concat's BlockManager consolidation plus a full re-sort
+    totals_row = totals_df.iloc[0]
+    insert_at = bisect.bisect_left(
+        list(zip(group_df["region"], group_df["category"])),
+        (totals_row["region"], totals_row["category"]),
+    )
+    combined_df = pd.DataFrame(
+        {
+            col: np.concatenate(
+                [
+                    group_df[col].to_numpy()[:insert_at],
+                    [totals_row[col]],
+                    group_df[col].to_numpy()[insert_at:],
+                ]
+            )
+            for col in group_df.columns
+        }
+    )
     return combined_df
 
 
@@ -137,8 +321,16 @@ def combine_results(group_df: pd.DataFrame, totals_df: pd.DataFrame) -> pd.DataF
 # Handles write errors (folder not found, permission issues, file in use, etc.)
 def save_summary(df: pd.DataFrame, output_path: Path) -> None:
     try:
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        df.to_csv(output_path, index=False)
+        # Skip the mkdir syscalls when the result directory already exists
+        if not output_path.parent.exists():
+            output_path.parent.mkdir(parents=True)
+        # Stream through Arrow's columnar CSV writer instead of the
+        # per-value Python formatter in DataFrame.to_csv
+        pacsv.write_csv(
+            pa.Table.from_pandas(df, preserve_index=False),
+            str(output_path),
+            write_options=pacsv.WriteOptions(quoting_style="needed"),
+        )
     except PermissionError as e:
         raise RuntimeError(
             f"Cannot write to output file (permission denied or file is open): {output_path}: {e}"
@@ -153,8 +345,7 @@ def save_summary(df: pd.DataFrame, output_path: Path) -> None:
 
 
 def main() -> None:
-    base_dir = Path(__file__).resolve().parent
-    data_dir = base_dir / "data"
+    data_dir = BASE_DIR / "data"
     input_dir = data_dir / "input"
     result_dir = data_dir / "result"
 
@@ -165,49 +356,38 @@ def main() -> None:
     sales_cols = {"order_id", "region", "product_id", "quantity", "unit_price"}
     products_cols = {"product_id", "product_name", "category", "unit_cost"}
 
-    sales_df = load_data(input_sales)
-    validate_format(sales_df, sales_cols)
-    products_df = load_data(products_sales)
-    validate_format(products_df, products_cols)
-
-    joined_df = join_data(sales_df, products_df)
+    products_df = load_data(products_sales, columns=products_cols)
 
-    #DEBUG
-    print("Joined data:")
-    print(joined_df)
+    # Check existence before stat so a missing sales file reports the
+    # same FileNotFoundError message as load_data
+    if not input_sales.exists():
+        raise FileNotFoundError(f"Input file not found: {input_sales}")
 
-    cleaned_joined_df = cleanup_joined_data(joined_df)
+    if input_sales.stat().st_size > CHUNKED_READ_THRESHOLD_BYTES:
+        # Too large to hold at once: aggregate in streaming chunks
+        aggregated_by_group_df = stream_aggregate(input_sales, products_df, sales_cols)
+    else:
+        sales_df = load_data(input_sales, columns=sales_cols)
 
-    #DEBUG
-    print("Cleaned joined data:")
-    print(cleaned_joined_df)
+        joined_df = join_data(sales_df, products_df)
 
-    enriched_joined_df = add_calculated_metrics(cleaned_joined_df)
+        # Group on categorical codes instead of hashing strings per row
+        joined_df["region"] = joined_df["region"].astype("category")
+        joined_df["category"] = joined_df["category"].astype("category")
+        logger.debug("joined rows=%d", len(joined_df))
 
-    #DEBUG
-    print("Enriched joined data:")
-    print(enriched_joined_df)
+        cleaned_joined_df = cleanup_joined_data(joined_df)
+        logger.debug("cleaned rows=%d", len(cleaned_joined_df))
 
-    aggregated_by_group_df = aggregate_by_group(enriched_joined_df)
+        enriched_joined_df = add_calculated_metrics(cleaned_joined_df)
 
-    #DEBUG
-    print("Aggregated by group data:")
-    print(aggregated_by_group_df)
+        aggregated_by_group_df = aggregate_by_group(enriched_joined_df)
+    logger.debug("groups=%d", len(aggregated_by_group_df))
 
-    aggregated_totals_df = aggregate_totals(enriched_joined_df)
-
-    #DEBUG
-    print("Aggregated totals data:")
-    print(aggregated_totals_df)
+    aggregated_totals_df = aggregate_totals(aggregated_by_group_df)
 
     final_result_df = combine_results(aggregated_by_group_df, aggregated_totals_df)
 
-    #DEBUG
-    print("Final result data:")
-    print(final_result_df)
-
-
-
     save_summary(final_result_df, output_file)
 
     print("Analysis completed.")
@@ -228,7 +408,7 @@ if __name__ == "__main__":
         import traceback
         import sys
 
-        log_path = Path(__file__).resolve().parent / "error.log"
+        log_path = BASE_DIR / "error.log"
         try:
             with open(log_path, "a", encoding="utf-8") as f:
                 f.write(traceback.format_exc())